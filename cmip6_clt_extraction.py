@@ -7,18 +7,26 @@ that have matching variants for both historical and ssp585 experiments.
 
 Requirements:
 - pyesgf
-- pandas
 - requests
 
-Install with: pip install pyesgf pandas requests
+Install with: pip install pyesgf requests
 """
 
-from pyesgf.search import SearchConnection
-import pandas as pd
+from pyesgf.search import SearchConnection, TYPE_FILE
+import argparse
+import contextlib
+import csv
+import json
 import os
+import re
+import requests
+import shelve
+import threading
 import time
 import sys
 from collections import defaultdict
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configure search parameters
 SEARCH_PARAMS = {
@@ -28,167 +36,216 @@ SEARCH_PARAMS = {
     'experiments': ['historical', 'ssp585']
 }
 
+# Columns of the model_summary.csv written by generate_wget_scripts
+SUMMARY_FIELDS = [
+    'model', 'institute', 'variant', 'grid',
+    'historical_files', 'ssp585_files',
+    'historical_wget', 'ssp585_wget'
+]
+
+# Shared default for missing multi-valued metadata fields in search results
+_EMPTY = ('',)
+
+# Configure the on-disk cache of ESGF search results
+CACHE_SETTINGS = {
+    'enabled': True,
+    'path': os.path.expanduser('~/.cache/cmip6_clt/search'),
+    'ttl': 24 * 60 * 60  # seconds
+}
+
+# shelve does not support concurrent access from the wget thread pool
+_cache_lock = threading.Lock()
+
+# In-process memo of search results, keyed like the disk cache
+_memo = {}
+
+# Per-thread ESGF connections for the wget thread pool
+_thread_state = threading.local()
+
 def get_connection():
-    """Connect to ESGF node."""
-    return SearchConnection('https://esgf-node.llnl.gov/esg-search', distrib=True)
+    """Connect to ESGF node.
+    A persistent requests.Session is passed in so HTTPS connections are pooled
+    across queries; otherwise pyesgf opens and closes a session per query."""
+    return SearchConnection('https://esgf-node.llnl.gov/esg-search', distrib=True,
+                            session=requests.Session())
 
-def find_matching_variants():
-    """Find models with matching variants for both historical and ssp585.
-    Searches ssp585 first since it typically has fewer available models."""
-    conn = get_connection()
-    
-    print("Searching for models with daily cloud cover (clt) data...")
-    print("This may take a few minutes. Please be patient.")
-    
+def _thread_connection():
+    """Return the calling thread's own connection, creating it on first use.
+    Each connection holds its own requests.Session, which is not guaranteed to be
+    thread-safe, so connections are not shared between threads."""
+    if not hasattr(_thread_state, 'conn'):
+        _thread_state.conn = get_connection()
+    return _thread_state.conn
+
+def _open_cache():
+    """Open the shelve cache, creating its directory on first use."""
+    os.makedirs(os.path.dirname(CACHE_SETTINGS['path']), exist_ok=True)
+    return shelve.open(CACHE_SETTINGS['path'])
+
+def _cache_get(key):
+    """Return the cached results for `key`, or None if missing or expired."""
+    with _cache_lock:
+        with _open_cache() as cache:
+            entry = cache.get(key)
+    if entry is None:
+        return None
+    stored_at, results = entry
+    if time.time() - stored_at > CACHE_SETTINGS['ttl']:
+        return None
+    return results
+
+def _cache_set(key, results):
+    """Store search results under `key` with the current timestamp."""
+    with _cache_lock:
+        with _open_cache() as cache:
+            cache[key] = (time.time(), results)
+
+def _fetch_datasets(conn, constraints):
+    """Run a dataset search, returning (dataset_id, json) tuples."""
+    ctx = conn.new_context(**constraints)
+    return [(ds.dataset_id, ds.json) for ds in ctx.search()]
+
+def _fetch_files(conn, constraints):
+    """Run a file search, returning (dataset_id, filename, download_url) tuples.
+    Facet counts are never used, so the extra facets=* count query is skipped."""
+    ctx = conn.new_context(search_type=TYPE_FILE, **constraints)
+    results = ctx.search(batch_size=1000, ignore_facet_check=True)
+    return [(f.json.get('dataset_id'), f.filename, f.download_url) for f in results]
+
+_FETCHERS = {
+    'datasets': _fetch_datasets,
+    'files': _fetch_files
+}
+
+def _cached_search(conn, kind, key):
+    """Run a search through the disk cache, memoised for the process lifetime.
+    Only plain tuples are cached, never live pyesgf results which hold the connection.
+    The memo is keyed on the search alone, so results are shared across connections."""
+    if key in _memo:
+        return _memo[key]
+    results = _cache_get(key)
+    if results is None:
+        constraints = dict(json.loads(key)[1])
+        results = _FETCHERS[kind](conn, constraints)
+        # An empty result often means a shard was down; don't pin it for a day
+        if not results:
+            return results
+        _cache_set(key, results)
+    _memo[key] = results
+    return results
+
+def _search(conn, kind, constraints):
+    """Dispatch a search to the cache, or straight to ESGF when caching is disabled."""
+    if not CACHE_SETTINGS['enabled']:
+        return _FETCHERS[kind](conn, constraints)
+    key = json.dumps([kind, sorted(constraints.items())])
+    return _cached_search(conn, kind, key)
+
+def search_datasets(conn, **constraints):
+    """Search ESGF datasets, returning a list of (dataset_id, json) tuples."""
+    return _search(conn, 'datasets', constraints)
+
+def search_files(conn, **constraints):
+    """Search ESGF files, returning a list of (dataset_id, filename, download_url) tuples."""
+    return _search(conn, 'files', constraints)
+
+def _search_and_parse(conn, experiment, **constraints):
+    """Search one experiment and return its variants grouped by model.
+    Variants of each model are keyed on (variant, grid) tuples."""
     # Define facets of interest for the search (resolves the warning)
     facets = 'project,experiment_id,source_id,institution_id,variant_label,grid_label,frequency,variable'
     
-    # Store all matched models by experiment
-    ssp585_models = {}
-    historical_models = {}
-    
-    # OPTIMIZED ORDER: Search for ssp585 experiment datasets FIRST since they're fewer
-    print("\nSearching for ssp585 experiment datasets...")
-    ssp_ctx = conn.new_context(
+    results = search_datasets(
+        conn,
         facets=facets,
         project=SEARCH_PARAMS['project'],
-        experiment_id='ssp585',
+        experiment_id=experiment,
         variable=SEARCH_PARAMS['variable'],
         frequency=SEARCH_PARAMS['frequency'],
-        latest=True
+        latest=True,
+        **constraints
     )
+    print(f"Found {len(results)} initial {experiment} datasets")
     
-    # Execute ssp585 search
-    ssp_results = ssp_ctx.search()
-    print(f"Found {len(ssp_results)} initial ssp585 datasets")
+    # Process results
+    print(f"Processing {experiment} datasets...")
+    by_model = defaultdict(dict)
     
-    # Process ssp585 results
-    print("Processing ssp585 datasets...")
-    
-    # Keep track of models we've seen to avoid duplicates
-    seen_models = set()
-    
-    for ds in ssp_results:
+    # Master and replica records of the same dataset are both returned, in no
+    # fixed order. Visit masters first, then by dataset_id, so the record kept
+    # for each (variant, grid) is the same on every run.
+    ordered_results = sorted(results, key=lambda r: (bool(r[1].get('replica')), r[0]))
+    for dataset_id, ds_json in ordered_results:
         try:
             # Extract metadata
-            source_id = ds.json.get('source_id', [''])[0]  # Model name
-            institute = ds.json.get('institution_id', [''])[0]
-            variant = ds.json.get('variant_label', [''])[0]
-            grid = ds.json.get('grid_label', [''])[0]
-            
-            # Create a unique identifier for this model
-            model_key = f"{source_id}"
+            source_id = ds_json.get('source_id', _EMPTY)[0]  # Model name
+            institute = ds_json.get('institution_id', _EMPTY)[0]
+            variant = ds_json.get('variant_label', _EMPTY)[0]
+            grid = ds_json.get('grid_label', _EMPTY)[0]
             
-            # Skip if we've already seen this model (to ensure uniqueness)
-            if model_key in seen_models:
-                continue
-                
-            # Mark this model as seen
-            seen_models.add(model_key)
-            
-            # Create a unique identifier for this model/variant combination
-            model_variant_key = f"{source_id}_{variant}_{grid}"
-            
-            # Store dataset info
-            ssp585_models[model_variant_key] = {
+            # Store dataset info, keeping every variant of each model
+            by_model[source_id].setdefault((variant, grid), {
                 'variant': variant,
                 'grid': grid,
-                'dataset_id': ds.dataset_id,
+                'dataset_id': dataset_id,
                 'model': source_id,
                 'institute': institute
-            }
+            })
         except Exception as e:
-            print(f"Error processing ssp585 dataset: {e}")
+            print(f"Error processing {experiment} dataset: {e}")
             continue  # Skip problematic entries
     
-    print(f"Processed {len(ssp585_models)} unique model-variant combinations for ssp585 experiment")
-    
-    # Now search for historical experiment datasets for the models we found in ssp585
-    print("\nSearching for historical experiment datasets...")
-    
-    # Reset seen models
-    seen_models = set()
-    
-    # Get the list of models we have in ssp585
-    ssp_models_list = list(set(info['model'] for info in ssp585_models.values()))
-    print(f"Searching for historical data from {len(ssp_models_list)} models found in ssp585")
-    
-    hist_ctx = conn.new_context(
-        facets=facets,
-        project=SEARCH_PARAMS['project'],
-        experiment_id='historical',
-        variable=SEARCH_PARAMS['variable'],
-        frequency=SEARCH_PARAMS['frequency'],
-        latest=True
-    )
-    
-    # Execute historical search
-    hist_results = hist_ctx.search()
-    print(f"Found {len(hist_results)} initial historical datasets")
+    print(f"Processed {sum(map(len, by_model.values()))} variants of {len(by_model)} models for {experiment} experiment")
+    return by_model
+
+def _variant_sort_key(variant):
+    """Sort key ordering variant labels numerically, e.g. r2i1p1f1 before r10i1p1f1."""
+    return tuple(int(n) for n in re.findall(r'\d+', variant)), variant
+
+def find_matching_variants(conn=None):
+    """Find models with matching variants for both historical and ssp585.
+    Searches ssp585 first since it typically has fewer available models."""
+    conn = conn or get_connection()
     
-    # Process historical results
-    print("Processing historical datasets...")
-    for ds in hist_results:
-        try:
-            # Extract metadata
-            source_id = ds.json.get('source_id', [''])[0]  # Model name
-            
-            # Skip if this model isn't in our ssp585 results
-            if source_id not in ssp_models_list:
-                continue
-                
-            institute = ds.json.get('institution_id', [''])[0]
-            variant = ds.json.get('variant_label', [''])[0]
-            grid = ds.json.get('grid_label', [''])[0]
-            
-            # Create a unique identifier for this model
-            model_key = f"{source_id}"
-            
-            # Skip if we've already seen this model (to ensure uniqueness)
-            if model_key in seen_models:
-                continue
-                
-            # Mark this model as seen
-            seen_models.add(model_key)
-            
-            # Create a unique identifier for this model/variant combination
-            model_variant_key = f"{source_id}_{variant}_{grid}"
-            
-            # Store dataset info
-            historical_models[model_variant_key] = {
-                'variant': variant,
-                'grid': grid,
-                'dataset_id': ds.dataset_id,
-                'model': source_id,
-                'institute': institute
-            }
-        except Exception as e:
-            print(f"Error processing historical dataset: {e}")
-            continue  # Skip problematic entries
+    print(f"Searching for models with {SEARCH_PARAMS['frequency']} {SEARCH_PARAMS['variable']} data...")
+    print("This may take a few minutes. Please be patient.")
     
-    print(f"Processed {len(historical_models)} unique model-variant combinations for historical experiment")
+    # OPTIMIZED ORDER: Search for ssp585 experiment datasets FIRST since they're fewer
+    print("\nSearching for ssp585 experiment datasets...")
+    ssp585_by_model = _search_and_parse(conn, 'ssp585')
     
-    # Find common model-variant combinations
-    common_keys = set(historical_models.keys()) & set(ssp585_models.keys())
+    # Now search for historical experiment datasets for the models we found in ssp585.
+    # This depends on the ssp585 results, so the two searches run one after the other.
+    print("\nSearching for historical experiment datasets...")
     
-    # Build matched models list, ensuring one variant per model
-    matched_models = []
-    already_included_models = set()
+    # Get the set of models we have in ssp585
+    ssp_models_set = set(ssp585_by_model)
+    print(f"Searching for historical data from {len(ssp_models_set)} models found in ssp585")
+    
+    # Restrict the historical search server-side to the ssp585 models. A list
+    # value is sent as repeated source_id parameters, which ESGF ORs together;
+    # an empty list would drop the constraint entirely, so skip the search then.
+    historical_by_model = {}
+    if ssp_models_set:
+        historical_by_model = _search_and_parse(conn, 'historical', source_id=sorted(ssp_models_set))
+    
+    # Find (model, variant, grid) combinations present in both experiments
+    common_models = ssp585_by_model.keys() & historical_by_model.keys()
+    common_keys = [
+        (model_name, variant, grid)
+        for model_name in common_models
+        for variant, grid in historical_by_model[model_name].keys() & ssp585_by_model[model_name].keys()
+    ]
+    
+    # Build matched models list, keeping the lowest-numbered variant of each
+    # model so the output does not depend on search or set ordering
+    matched_by_model = {}
     
     print("\nFinding matching model variants between experiments...")
-    for key in common_keys:
-        hist_info = historical_models[key]
-        ssp_info = ssp585_models[key]
-        
-        # Skip if we've already included this model
-        model_name = hist_info['model']
-        if model_name in already_included_models:
-            continue
-            
-        # Mark this model as included
-        already_included_models.add(model_name)
-        
-        matched_models.append({
+    for model_name, variant, grid in sorted(common_keys, key=lambda k: (k[0], _variant_sort_key(k[1]), k[2])):
+        hist_info = historical_by_model[model_name][(variant, grid)]
+        ssp_info = ssp585_by_model[model_name][(variant, grid)]
+        matched_by_model.setdefault(model_name, {
             'model': hist_info['model'],
             'institute': hist_info['institute'],
             'variant': hist_info['variant'],
@@ -196,6 +253,7 @@ def find_matching_variants():
             'historical_dataset': hist_info['dataset_id'],
             'ssp585_dataset': ssp_info['dataset_id']
         })
+    matched_models = list(matched_by_model.values())
     
     print(f"Found {len(matched_models)} unique models with matching variants for both experiments")
     
@@ -209,84 +267,180 @@ def find_matching_variants():
     
     return matched_models
 
-def generate_wget_scripts(matched_models, output_dir="./wget_scripts"):
-    """Generate wget scripts for each matched model."""
-    conn = get_connection()
-    
-    # Create output directory
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Track information for summary
-    model_summary = []
-    
-    for i, model_info in enumerate(matched_models):
-        model_name = model_info['model']
-        variant = model_info['variant']
-        print(f"\nProcessing [{i+1}/{len(matched_models)}] {model_name} {variant}")
+def _process_model(model_info, model_dir, files_by_ds):
+    """Write the wget scripts for a single matched model and return its summary row.
+    `files_by_ds` maps dataset_id to its prefetched file list; datasets missing
+    from it are queried individually."""
+    model_name = model_info['model']
+    variant = model_info['variant']
+    print(f"\nProcessing {model_name} {variant}")
+    
+    file_counts = {}
+    wget_paths = {}
+    
+    # Process each experiment
+    for experiment in SEARCH_PARAMS['experiments']:
+        dataset_id = model_info[f'{experiment}_dataset']
         
-        model_dir = os.path.join(output_dir, f"{model_name}_{variant}")
-        os.makedirs(model_dir, exist_ok=True)
-        
-        file_counts = {}
-        wget_paths = {}
-        
-        # Process each experiment
-        for experiment in ['historical', 'ssp585']:
-            dataset_id = model_info[f'{experiment}_dataset']
+        try:
+            # Get files, falling back to a per-dataset query if the batch missed them
+            files = files_by_ds.get(dataset_id)
+            if not files:
+                files = search_files(_thread_connection(), dataset_id=dataset_id)
+            file_counts[experiment] = len(files)
             
-            try:
-                # Get dataset
-                dataset = conn.search(dataset_id=dataset_id)[0]
-                
-                # Get file context
-                file_ctx = dataset.file_context()
-                files = file_ctx.search()
-                file_counts[experiment] = len(files)
-                
-                # Generate wget script
-                wget_path = os.path.join(model_dir, f"{experiment}_wget.sh")
-                with open(wget_path, 'w') as f:
-                    f.write("#!/bin/bash\n\n")
-                    f.write(f"# Download script for {model_name} {variant} {experiment}\n")
-                    f.write(f"# Dataset: {dataset_id}\n\n")
-                    
-                    for file in files:
-                        url = file.download_url
-                        if url:
-                            f.write(f"wget '{url}' -O '{file.filename}'\n")
-                
-                os.chmod(wget_path, 0o755)  # Make executable
-                wget_paths[experiment] = wget_path
-                
-                print(f"  {experiment}: Found {len(files)} files, script saved to {wget_path}")
+            # Generate wget script
+            wget_path = model_dir / f"{experiment}_wget.sh"
+            lines = [
+                "#!/bin/bash\n",
+                f"# Download script for {model_name} {variant} {experiment}",
+                f"# Dataset: {dataset_id}\n"
+            ]
+            lines.extend(f"wget '{url}' -O '{filename}'" for _, filename, url in files if url)
+            with open(wget_path, 'w') as f:
+                f.write("\n".join(lines) + "\n")
+            
+            os.chmod(wget_path, 0o755)  # Make executable
+            wget_paths[experiment] = str(wget_path)
             
+            print(f"  {model_name} {experiment}: Found {len(files)} files, script saved to {wget_path}")
+        
+        except Exception as e:
+            print(f"  Error processing {model_name} {experiment} dataset: {e}")
+            file_counts[experiment] = 0
+    
+    return {
+        'model': model_name,
+        'institute': model_info['institute'],
+        'variant': variant,
+        'grid': model_info['grid'],
+        'historical_files': file_counts.get('historical', 0),
+        'ssp585_files': file_counts.get('ssp585', 0),
+        'historical_wget': wget_paths.get('historical', ''),
+        'ssp585_wget': wget_paths.get('ssp585', '')
+    }
+
+def _fetch_file_chunk(dataset_ids):
+    """Batched file search for a chunk of dataset ids, run on a pool worker."""
+    return search_files(_thread_connection(), dataset_id=dataset_ids)
+
+def generate_wget_scripts(matched_models, output_dir="./wget_scripts", max_workers=8):
+    """Generate wget scripts for each matched model.
+    The batched file searches and any per-model fallback queries are
+    network-bound, so both run concurrently on a thread pool where each
+    worker uses its own connection."""
+    # Create the output directory and one subdirectory per model up front
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model_dirs = [output_dir / f"{m['model']}_{m['variant']}" for m in matched_models]
+    for model_dir in model_dirs:
+        model_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Fetch the files of all matched datasets with a few batched file searches
+    # rather than one per dataset. A list of dataset_ids is sent as repeated
+    # parameters (ORed by ESGF), chunked to keep the request URL a sane length.
+    all_ids = ([m['historical_dataset'] for m in matched_models] +
+               [m['ssp585_dataset'] for m in matched_models])
+    chunk_size = 20
+    files_by_ds = defaultdict(list)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        chunk_futures = [
+            executor.submit(_fetch_file_chunk, all_ids[start:start + chunk_size])
+            for start in range(0, len(all_ids), chunk_size)
+        ]
+        for future in as_completed(chunk_futures):
+            try:
+                chunk_files = future.result()
             except Exception as e:
-                print(f"  Error processing {experiment} dataset: {e}")
-                file_counts[experiment] = 0
+                # Leave these datasets out; _process_model queries them one by one
+                print(f"Error processing batched file search: {e}")
+                continue
+            for file_info in chunk_files:
+                files_by_ds[file_info[0]].append(file_info)
+    print(f"Retrieved files for {len(files_by_ds)} of {len(all_ids)} matched datasets")
+    
+    # Track information for summary, keyed on submission order so the CSV
+    # keeps the same ordering as matched_models
+    summary_rows = {}
+    next_row = 0
+    
+    # Stream the summary file as models complete so partial progress survives a crash
+    summary_path = output_dir / "model_summary.csv"
+    with open(summary_path, 'w', newline='') as fp, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        writer = csv.DictWriter(fp, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
         
-        # Add to summary
-        model_summary.append({
-            'model': model_name,
-            'institute': model_info['institute'],
-            'variant': variant,
-            'grid': model_info['grid'],
-            'historical_files': file_counts.get('historical', 0),
-            'ssp585_files': file_counts.get('ssp585', 0),
-            'historical_wget': wget_paths.get('historical', ''),
-            'ssp585_wget': wget_paths.get('ssp585', '')
-        })
+        futures = {
+            executor.submit(_process_model, model_info, model_dir, files_by_ds): i
+            for i, (model_info, model_dir) in enumerate(zip(matched_models, model_dirs))
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            summary_rows[i] = future.result()
+            print(f"Completed [{done}/{len(matched_models)}] {summary_rows[i]['model']} {summary_rows[i]['variant']}")
+            
+            # Write out every row whose predecessors have all completed
+            while next_row in summary_rows:
+                writer.writerow(summary_rows[next_row])
+                next_row += 1
+            fp.flush()
     
-    # Create summary file
-    summary_df = pd.DataFrame(model_summary)
-    summary_path = os.path.join(output_dir, "model_summary.csv")
-    summary_df.to_csv(summary_path, index=False)
+    model_summary = [summary_rows[i] for i in range(len(matched_models))]
     
     print(f"\nSummary saved to {summary_path}")
-    return summary_df
+    return model_summary
+
+def _positive_int(value):
+    """argparse type accepting only integers greater than zero."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Find and download CMIP6 data for models with matching historical and ssp585 variants")
+    parser.add_argument('--variable', default=SEARCH_PARAMS['variable'],
+                        help="CMIP6 variable to search for (default: %(default)s)")
+    parser.add_argument('--frequency', default=SEARCH_PARAMS['frequency'],
+                        help="Output frequency to search for (default: %(default)s)")
+    parser.add_argument('--output-dir', default=None,
+                        help="Directory to write wget scripts to (default: ./cmip6_<variable>_data "
+                             "for daily data, ./cmip6_<variable>_<frequency>_data otherwise)")
+    parser.add_argument('--max-workers', type=_positive_int, default=8,
+                        help="Number of models processed concurrently (default: %(default)s)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="List the matched models and exit without querying files")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Bypass the on-disk cache of ESGF search results")
+    return parser.parse_args()
 
-def main():
-    print("CMIP6 Cloud Cover (clt) Data Extractor")
-    print("--------------------------------------")
+def _default_output_dir(variable, frequency):
+    """Per-variable output directory, e.g. ./cmip6_clt_data or ./cmip6_tas_mon_data.
+    Daily data keeps the original ./cmip6_<variable>_data layout."""
+    if frequency == 'day':
+        return f"./cmip6_{variable}_data"
+    return f"./cmip6_{variable}_{frequency}_data"
+
+@contextlib.contextmanager
+def _overridden(settings, **values):
+    """Temporarily update a module-level settings dict, restoring it on exit."""
+    saved = dict(settings)
+    settings.update(values)
+    try:
+        yield
+    finally:
+        settings.clear()
+        settings.update(saved)
+
+def _run_extraction(max_workers, dry_run, output_dir):
+    """Search, match and write wget scripts using the current SEARCH_PARAMS."""
+    title = f"CMIP6 {SEARCH_PARAMS['variable']} ({SEARCH_PARAMS['frequency']}) Data Extractor"
+    print(title)
+    print("-" * len(title))
     
     # Find models with matching variants
     matched_models = find_matching_variants()
@@ -303,9 +457,17 @@ def main():
         print("3. Try again later as ESGF indexes are periodically updated")
         return
     
+    # Stop before the file searches when only previewing the matches
+    if dry_run:
+        print("\nMatched models (dry run, no wget scripts generated):")
+        for model in matched_models:
+            print(f"  {model['model']} {model['variant']} {model['grid']} ({model['institute']})")
+            print(f"    historical: {model['historical_dataset']}")
+            print(f"    ssp585:     {model['ssp585_dataset']}")
+        return
+    
     # Generate wget scripts
-    output_dir = "./cmip6_clt_data"
-    summary = generate_wget_scripts(matched_models, output_dir)
+    summary = generate_wget_scripts(matched_models, output_dir, max_workers=max_workers)
     
     # Print usage instructions
     print("\nData Extraction Instructions:")
@@ -317,16 +479,30 @@ def main():
     print("3. You may need to create an ESGF account and add credentials for datasets requiring authentication")
     print("\nTop 5 models by total file count:")
     
-    # Calculate total files and sort
-    summary['total_files'] = summary['historical_files'] + summary['ssp585_files']
-    top_models = summary.sort_values('total_files', ascending=False).head(5)
+    # Sort by total files
+    top_models = sorted(summary, key=lambda row: row['historical_files'] + row['ssp585_files'], reverse=True)[:5]
     
-    for _, row in top_models.iterrows():
-        print(f"  {row['model']} {row['variant']}: {row['total_files']} files " 
+    for row in top_models:
+        total_files = row['historical_files'] + row['ssp585_files']
+        print(f"  {row['model']} {row['variant']}: {total_files} files " 
               f"({row['historical_files']} historical, {row['ssp585_files']} ssp585)")
     
     print("\nNote: For large models with many files, you may want to subset data by time period")
     print("or geographical region before downloading. Consider using OPeNDAP for this purpose.")
 
+def main(max_workers=8, use_cache=True, dry_run=False, output_dir=None,
+         variable=SEARCH_PARAMS['variable'], frequency=SEARCH_PARAMS['frequency']):
+    # Keep each variable/frequency in its own directory so runs don't overwrite each other
+    if output_dir is None:
+        output_dir = _default_output_dir(variable, frequency)
+    
+    # Settings apply to this run only and are restored afterwards
+    with _overridden(SEARCH_PARAMS, variable=variable, frequency=frequency), \
+         _overridden(CACHE_SETTINGS, enabled=use_cache):
+        _run_extraction(max_workers, dry_run, output_dir)
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(max_workers=args.max_workers, use_cache=not args.no_cache,
+         dry_run=args.dry_run, output_dir=args.output_dir,
+         variable=args.variable, frequency=args.frequency)